@@ -0,0 +1,32 @@
+# Generated by Django 5.2.5 on 2026-08-26 12:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('circulation', '0001_initial'),
+        ('library', '0005_section_slug'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bookloan',
+            index=models.Index(fields=['status', 'due_date'], name='loan_status_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bookloan',
+            index=models.Index(condition=models.Q(('status', 'borrowed')), fields=['due_date'], name='loan_overdue_partial'),
+        ),
+        migrations.AddIndex(
+            model_name='fine',
+            index=models.Index(fields=['paid', 'paid_date'], name='fine_paid_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['status', 'reservation_date'], name='res_status_date_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-08-26 12:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('circulation', '0002_bookloan_loan_status_due_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='fine',
+            index=models.Index(condition=models.Q(('paid', False)), fields=['fine_date'], name='fine_unpaid_date_idx'),
+        ),
+    ]
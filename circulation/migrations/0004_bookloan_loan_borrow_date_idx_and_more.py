@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-08-26 13:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('circulation', '0003_fine_fine_unpaid_date_idx'),
+        ('library', '0005_section_slug'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bookloan',
+            index=models.Index(fields=['borrow_date'], name='loan_borrow_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bookloan',
+            index=models.Index(fields=['book_copy', 'status'], name='loan_copy_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fine',
+            index=models.Index(fields=['fine_date'], name='fine_date_idx'),
+        ),
+    ]
@@ -27,6 +27,25 @@ class BookLoan(models.Model):
     class Meta:
         db_table = 'book_loans'
         ordering = ['-borrow_date']
+        indexes = [
+            models.Index(
+                fields=['status', 'due_date'], name='loan_status_due_idx'
+            ),
+            # Partial index covering the overdue scan, which only ever
+            # looks at loans still out
+            models.Index(
+                fields=['due_date'],
+                name='loan_overdue_partial',
+                condition=models.Q(status='borrowed'),
+            ),
+            # Date-range report filters and the monthly grouping
+            models.Index(fields=['borrow_date'], name='loan_borrow_date_idx'),
+            # Availability probes ask "is this copy out?" — an early
+            # exit lookup on this pair
+            models.Index(
+                fields=['book_copy', 'status'], name='loan_copy_status_idx'
+            ),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.book_copy.book.title}"
@@ -103,6 +122,12 @@ class Reservation(models.Model):
     class Meta:
         db_table = 'reservations'
         ordering = ['queue_position', 'reservation_date']
+        indexes = [
+            models.Index(
+                fields=['status', 'reservation_date'],
+                name='res_status_date_idx',
+            ),
+        ]
         unique_together = ['user', 'book', 'status']  # Prevent duplicate active reservations
     
     def __str__(self):
@@ -210,6 +235,20 @@ class Fine(models.Model):
     class Meta:
         db_table = 'fines'
         ordering = ['-fine_date']
+        indexes = [
+            models.Index(
+                fields=['paid', 'paid_date'], name='fine_paid_date_idx'
+            ),
+            # Partial index matching the unpaid-fines listing, which
+            # filters paid=False and orders by fine_date
+            models.Index(
+                fields=['fine_date'],
+                name='fine_unpaid_date_idx',
+                condition=models.Q(paid=False),
+            ),
+            # Default ordering and the report date-range filters
+            models.Index(fields=['fine_date'], name='fine_date_idx'),
+        ]
     
     def __str__(self):
         status = "Paid" if self.paid else "Unpaid"
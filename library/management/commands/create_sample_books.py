@@ -1,13 +1,29 @@
 from django.core.management.base import BaseCommand
-from django.db import transaction
+from django.db import connection, transaction
 from library.models import Book, Author, Publisher, Section, Branch, BookCopy
-import random
+import numpy as np
+
+try:
+    # Optional: COPY-based bulk loading on PostgreSQL
+    from django_bulk_load import bulk_insert_models
+except ImportError:
+    bulk_insert_models = None
 
 
 class Command(BaseCommand):
     help = 'Create sample books across different categories for all branches'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=None,
+            help='Seed the random generator for reproducible runs'
+        )
+
     def handle(self, *args, **options):
+        verbosity = options['verbosity']
+        rng = np.random.default_rng(options['seed'])
         with transaction.atomic():
             # Sample books data
             sample_books = [
@@ -104,16 +120,37 @@ class Command(BaseCommand):
             ]
 
             created_books = 0
-            created_copies = 0
+            all_copies = []
+
+            # Pre-generate all random draws in one vectorized batch
+            # instead of calling random.* once per copy
+            branches = list(Branch.objects.all())
+            default_section = Section.objects.first()
+            n_slots = max(len(sample_books) * len(branches), 1)
+            copy_counts = rng.integers(1, 3, n_slots)
+            prices = rng.uniform(200, 800, n_slots * 2)
+            isbn_p1 = rng.integers(1000, 10000, len(sample_books))
+            isbn_p2 = rng.integers(10, 100, len(sample_books))
+            slot = 0
+            price_idx = 0
+
+            # Fetch already-created titles in one query instead of an
+            # exists() round-trip per book
+            titles = [b['title'] for b in sample_books]
+            existing_titles = set(
+                Book.objects.filter(title__in=titles)
+                .values_list('title', flat=True)
+            )
 
             for book_data in sample_books:
                 # Check if book already exists
-                if Book.objects.filter(title=book_data['title']).exists():
-                    self.stdout.write(
-                        self.style.WARNING(
-                            f'Book "{book_data["title"]}" already exists'
+                if book_data['title'] in existing_titles:
+                    if verbosity >= 2:
+                        self.stdout.write(
+                            self.style.WARNING(
+                                f'Book "{book_data["title"]}" already exists'
+                            )
                         )
-                    )
                     continue
 
                 # Create or get publisher
@@ -122,13 +159,10 @@ class Command(BaseCommand):
                     defaults={'address': 'Maldives'}
                 )
 
-                # Generate ISBN
-                isbn_part1 = random.randint(1000, 9999)
-                isbn_part2 = random.randint(10, 99)
-                isbn = f'978999{isbn_part1}{isbn_part2}'
-
-                # Get appropriate section (we'll use the first available one)
-                section = Section.objects.first()
+                # Generate ISBN from the pre-drawn digit batches
+                isbn = (
+                    f'978999{isbn_p1[created_books]}{isbn_p2[created_books]}'
+                )
 
                 # Create book
                 book = Book.objects.create(
@@ -139,7 +173,7 @@ class Command(BaseCommand):
                     edition=book_data['edition'],
                     publication_year=book_data['publication_year'],
                     publisher=publisher,
-                    section=section
+                    section=default_section
                 )
 
                 # Create authors and link them
@@ -150,9 +184,8 @@ class Command(BaseCommand):
                     book.authors.add(author)
 
                 created_books += 1
-                
+
                 # Create copies in each branch
-                branches = Branch.objects.all()
                 for branch in branches:
                     # Get appropriate section for this branch
                     branch_sections = Section.objects.filter(branch=branch)
@@ -167,49 +200,63 @@ class Command(BaseCommand):
                         appropriate_section = branch_sections.first()
 
                     # Create 1-2 copies per branch
-                    num_copies = random.randint(1, 2)
+                    num_copies = int(copy_counts[slot])
+                    slot += 1
                     for i in range(num_copies):
                         barcode = f'BC{book.id:04d}{branch.id:02d}{i+1:02d}'
-                        
-                        BookCopy.objects.create(
+
+                        all_copies.append(BookCopy(
                             book=book,
                             branch=branch,
                             section=appropriate_section,
                             barcode=barcode,
-                            purchase_price=random.uniform(200, 800),
+                            purchase_price=float(prices[price_idx]),
                             condition='good'
-                        )
-                        created_copies += 1
+                        ))
+                        price_idx += 1
 
-                self.stdout.write(
-                    f'Created: "{book.title}" with {num_copies} copies '
-                    f'per branch'
-                )
+                if verbosity >= 2:
+                    self.stdout.write(
+                        f'Created: "{book.title}" with {num_copies} copies '
+                        f'per branch'
+                    )
+
+            self._bulk_create_copies(all_copies)
 
             self.stdout.write(
                 self.style.SUCCESS(
                     f'\n✅ Created {created_books} new books with '
-                    f'{created_copies} total copies'
+                    f'{len(all_copies)} total copies'
                 )
             )
 
+    def _bulk_create_copies(self, copies):
+        """Insert copies in one batch, using COPY on PostgreSQL"""
+        if not copies:
+            return
+        if bulk_insert_models and connection.vendor == 'postgresql':
+            bulk_insert_models(copies)
+        else:
+            BookCopy.objects.bulk_create(copies, batch_size=500)
+
     def _get_section_for_category(self, category, sections):
         """Get the most appropriate section for a book category"""
         category_mapping = {
-            'fiction': ['Fiction'],
-            'non-fiction': ['Non-Fiction'],
-            'children': ['Children', 'Children\'s Books'],
-            'research': ['Research', 'Academic'],
-            'academic': ['Academic', 'Research'],
-            'reference': ['Reference'],
+            'fiction': ['fiction'],
+            'non-fiction': ['non-fiction'],
+            'children': ['children', 'childrens-books'],
+            'research': ['research', 'academic'],
+            'academic': ['academic', 'research'],
+            'reference': ['reference'],
         }
-        
+
         if category in category_mapping:
-            for section_name in category_mapping[category]:
-                matching_section = sections.filter(
-                    name__icontains=section_name
-                ).first()
-                if matching_section:
-                    return matching_section
-        
+            # Indexed equality on the normalized slug instead of an
+            # unindexable icontains scan
+            matching_section = sections.filter(
+                slug__in=category_mapping[category]
+            ).first()
+            if matching_section:
+                return matching_section
+
         return sections.first()
@@ -4,14 +4,25 @@ Management command to create sample data for the LMS
 
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
+from django.db import connection, transaction
 from django.utils import timezone
 from datetime import date, timedelta
+import numpy as np
 import random
 
-from authentication.models import Role, MembershipFee
+from django.contrib.auth.hashers import make_password
+
+from authentication.models import Role, MembershipFee, UserRole
 from library.models import Author, Publisher, Book, BookCopy, Branch, Section
+from library.utils import recount_book_loan_counts
 from circulation.models import BookLoan, Reservation, Fine
 
+try:
+    # Optional: COPY-based bulk loading on PostgreSQL
+    from django_bulk_load import bulk_insert_models
+except ImportError:
+    bulk_insert_models = None
+
 User = get_user_model()
 
 
@@ -31,28 +42,39 @@ class Command(BaseCommand):
             default=50,
             help='Number of books to create'
         )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=None,
+            help='Seed the random generators for reproducible runs'
+        )
 
     def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        self.rng = random.Random(options['seed'])
+        self.np_rng = np.random.default_rng(options['seed'])
         self.stdout.write('Creating sample data...')
-        
-        # Create roles
-        self.create_roles()
-        
-        # Create membership fees
-        self.create_membership_fees()
-        
-        # Create library data
-        self.create_library_data()
-        
-        # Create users
-        self.create_users(options['users'])
-        
-        # Create books
-        self.create_books(options['books'])
-        
-        # Create some loans and reservations
-        self.create_circulation_data()
-        
+
+        # Commit everything at once instead of autocommitting per INSERT
+        with transaction.atomic():
+            # Create roles
+            self.create_roles()
+
+            # Create membership fees
+            self.create_membership_fees()
+
+            # Create library data
+            self.create_library_data()
+
+            # Create users
+            self.create_users(options['users'])
+
+            # Create books
+            self.create_books(options['books'])
+
+            # Create some loans and reservations
+            self.create_circulation_data()
+
         self.stdout.write(
             self.style.SUCCESS('Successfully created sample data!')
         )
@@ -71,7 +93,7 @@ class Command(BaseCommand):
                 name=role_name,
                 defaults={'description': description}
             )
-            if created:
+            if created and self.verbosity >= 2:
                 self.stdout.write(f'Created role: {role_name}')
 
     def create_membership_fees(self):
@@ -108,7 +130,7 @@ class Command(BaseCommand):
                 membership_type=fee_data['membership_type'],
                 defaults=fee_data
             )
-            if created:
+            if created and self.verbosity >= 2:
                 self.stdout.write(f'Created membership fee: {fee_data["membership_type"]}')
 
     def create_library_data(self):
@@ -124,7 +146,7 @@ class Command(BaseCommand):
         
         for name in authors_data:
             author, created = Author.objects.get_or_create(name=name)
-            if created:
+            if created and self.verbosity >= 2:
                 self.stdout.write(f'Created author: {name}')
 
         # Publishers
@@ -139,7 +161,7 @@ class Command(BaseCommand):
                 name=name,
                 defaults={'address': f'{name} Address'}
             )
-            if created:
+            if created and self.verbosity >= 2:
                 self.stdout.write(f'Created publisher: {name}')
 
         # Branch
@@ -162,7 +184,7 @@ class Command(BaseCommand):
                 name=name,
                 branch=branch
             )
-            if created:
+            if created and self.verbosity >= 2:
                 self.stdout.write(f'Created section: {name}')
 
     def create_users(self, count):
@@ -193,30 +215,45 @@ class Command(BaseCommand):
                 is_staff=True,
                 national_id='L001'
             )
-            librarian.role = librarian_role
-            librarian.save()
+            UserRole.objects.get_or_create(user=librarian, role=librarian_role)
             self.stdout.write(
                 'Created librarian user (librarian/librarian123)'
             )
 
         # Create regular users
         membership_fees = list(MembershipFee.objects.all())
-        
+
+        # Fetch existing usernames in one query and hash the shared
+        # password once instead of per user
+        usernames = [f'user{i+1}' for i in range(count)]
+        existing_usernames = set(
+            User.objects.filter(username__in=usernames)
+            .values_list('username', flat=True)
+        )
+        password = make_password('password123')
+
+        new_users = []
         for i in range(count):
-            username = f'user{i+1}'
-            if not User.objects.filter(username=username).exists():
-                user = User.objects.create_user(
+            username = usernames[i]
+            if username not in existing_usernames:
+                new_users.append(User(
                     username=username,
                     email=f'{username}@example.com',
-                    password='password123',
+                    password=password,
                     first_name=f'User{i+1}',
                     last_name='Test',
-                    national_id=f'U{i+1:03d}'
-                )
-                user.role = member_role
-                user.membership_fee = random.choice(membership_fees)
-                user.save()
-                
+                    national_id=f'U{i+1:03d}',
+                    membership_fee=self.rng.choice(membership_fees)
+                ))
+
+        created_users = User.objects.bulk_create(new_users, batch_size=500)
+
+        # Assign the member role in one batch
+        UserRole.objects.bulk_create(
+            [UserRole(user=user, role=member_role) for user in created_users],
+            ignore_conflicts=True
+        )
+
         self.stdout.write(f'Created {count} sample users')
 
     def create_books(self, count):
@@ -242,44 +279,70 @@ class Command(BaseCommand):
             'Physics Made Simple', 'Chemistry Fundamentals', 'Biology'
         ]
         
-        for i in range(min(count, len(book_titles))):
+        all_copies = []
+
+        # Pre-generate candidate ISBNs in one batch and pre-filter
+        # collisions with a single query
+        n_books = min(count, len(book_titles))
+        isbn_tails = self.np_rng.integers(
+            1_000_000_000, 10_000_000_000, n_books, dtype=np.int64
+        )
+        candidate_isbns = [f'978{tail}' for tail in isbn_tails]
+        taken_isbns = set(Book.objects.filter(
+            isbn__in=candidate_isbns
+        ).values_list('isbn', flat=True))
+
+        for i in range(n_books):
             title = book_titles[i]
             if not Book.objects.filter(title=title).exists():
-                # Generate a random but valid ISBN
-                isbn = f'978{random.randint(1000000000, 9999999999)}'
-                
+                isbn = candidate_isbns[i]
+                while isbn in taken_isbns:
+                    isbn = f'978{self.rng.randint(1000000000, 9999999999)}'
+                taken_isbns.add(isbn)
+
                 book = Book.objects.create(
                     title=title,
                     isbn=isbn,
-                    category=random.choice(['fiction', 'non-fiction', 'academic']),
+                    category=self.rng.choice(['fiction', 'non-fiction', 'academic']),
                     edition='1st Edition',
-                    publication_year=random.randint(2000, 2024),
+                    publication_year=self.rng.randint(2000, 2024),
                     language='english',
-                    publisher=random.choice(publishers),
-                    section=random.choice(sections)
+                    publisher=self.rng.choice(publishers),
+                    section=self.rng.choice(sections)
                 )
                 
                 # Add author through BookAuthor relationship
                 from library.models import BookAuthor
                 BookAuthor.objects.create(
                     book=book,
-                    author=random.choice(authors)
+                    author=self.rng.choice(authors)
                 )
                 
                 # Create book copies
-                num_copies = random.randint(2, 5)
+                num_copies = self.rng.randint(2, 5)
                 for j in range(num_copies):
                     barcode = f"{book.isbn}-{j+1:03d}"  # Generate unique barcode
-                    purchase_price = random.uniform(15.0, 150.0)  # Random price
-                    BookCopy.objects.create(
+                    purchase_price = self.rng.uniform(15.0, 150.0)  # Random price
+                    all_copies.append(BookCopy(
                         book=book,
                         barcode=barcode,
                         purchase_price=purchase_price,
                         condition='good'
-                    )
-                
+                    ))
+
+        self._bulk_create_copies(all_copies)
+
         self.stdout.write(f'Created {count} books with copies')
 
+    def _bulk_create_copies(self, copies):
+        """Insert copies in one batch, using COPY on PostgreSQL"""
+        if not copies:
+            return
+        if bulk_insert_models and connection.vendor == 'postgresql':
+            bulk_insert_models(copies)
+        else:
+            BookCopy.objects.bulk_create(copies, batch_size=500)
+
     def create_circulation_data(self):
         """Create some loans, reservations, and fines for testing"""
         # Get regular users (not superusers/staff)
@@ -291,51 +354,66 @@ class Command(BaseCommand):
             return
         
         # Create some current loans
-        for i in range(min(10, len(users), len(book_copies))):
-            user = users[i]
+        loan_count = min(10, len(users), len(book_copies))
+
+        # Fetch already-loaned copies in one query instead of an
+        # exists() check per copy
+        borrowed_ids = set(BookLoan.objects.filter(
+            book_copy__in=book_copies[:loan_count],
+            status='borrowed'
+        ).values_list('book_copy_id', flat=True))
+
+        loans = []
+        for i in range(loan_count):
             book_copy = book_copies[i]
-            
-            # Check if this book copy is already loaned
-            if not BookLoan.objects.filter(
+            if book_copy.id in borrowed_ids:
+                continue
+
+            borrow_date = timezone.now().date() - timedelta(days=self.rng.randint(1, 20))
+            loans.append(BookLoan(
+                user=users[i],
                 book_copy=book_copy,
+                borrow_date=borrow_date,
+                due_date=borrow_date + timedelta(days=14),
                 status='borrowed'
-            ).exists():
-                borrowed_date = timezone.now().date() - timedelta(days=random.randint(1, 20))
-                due_date = borrowed_date + timedelta(days=14)
-                
-                loan = BookLoan.objects.create(
-                    user=user,
-                    book_copy=book_copy,
-                    borrowed_date=borrowed_date,
-                    due_date=due_date,
-                    status='borrowed'
-                )
-                
-                # Create some overdue loans with fines
-                if random.random() < 0.3 and due_date < timezone.now().date():
-                    days_overdue = (timezone.now().date() - due_date).days
-                    fine_amount = days_overdue * 2  # 2 MVR per day
-                    
-                    Fine.objects.create(
-                        user=user,
-                        book_loan=loan,
-                        amount=fine_amount,
-                        fine_date=timezone.now().date(),
-                        description=f'Late return fee for {days_overdue} days',
-                        status='pending'
-                    )
+            ))
+
+        created_loans = BookLoan.objects.bulk_create(loans)
+        # bulk_create skips the signal receivers that maintain the
+        # denormalized Book.loan_count, so resync the affected books
+        recount_book_loan_counts(
+            {loan.book_copy.book_id for loan in created_loans}
+        )
+
+        # Create some overdue loans with fines
+        today = timezone.now().date()
+        fines = []
+        for loan in created_loans:
+            if self.rng.random() < 0.3 and loan.due_date < today:
+                days_overdue = (today - loan.due_date).days
+                fine_amount = days_overdue * 2  # 2 MVR per day
+
+                fines.append(Fine(
+                    user=loan.user,
+                    book_loan=loan,
+                    amount=fine_amount,
+                    description=f'Late return fee for {days_overdue} days',
+                    paid=False
+                ))
+
+        Fine.objects.bulk_create(fines)
         
         # Create some reservations
         available_books = Book.objects.exclude(
             bookcopy__bookloan__status='borrowed'
-        )[:5]
-        
+        ).prefetch_related('authors')[:5]
+
         for i, book in enumerate(available_books):
             if i < len(users):
                 Reservation.objects.create(
                     user=users[i],
                     book=book,
-                    reserved_date=timezone.now().date(),
+                    reservation_date=timezone.now().date(),
                     queue_position=1,
                     status='active'
                 )
@@ -7,7 +7,8 @@ from django.utils import timezone
 from django.db import models
 from datetime import timedelta
 from circulation.models import BookLoan
-from library.models import Book
+from library.models import Book, BookCopy
+from library.utils import recount_book_loan_counts
 
 User = get_user_model()
 
@@ -26,7 +27,8 @@ class Command(BaseCommand):
 
     def handle(self, *args, **options):
         count = options['count']
-        
+        verbosity = options['verbosity']
+
         try:
             # Get some users to borrow books
             users = User.objects.filter(is_active=True)[:5]
@@ -41,7 +43,14 @@ class Command(BaseCommand):
             # Find books with multiple copies that we can make unavailable
             books_with_multiple_copies = Book.objects.annotate(
                 copy_count=models.Count('bookcopy')
-            ).filter(copy_count__gte=2)[:count]
+            ).filter(copy_count__gte=2).prefetch_related(
+                'authors',
+                models.Prefetch(
+                    'bookcopy_set',
+                    queryset=BookCopy.objects.all(),
+                    to_attr='copies_list'
+                )
+            )[:count]
 
             if len(books_with_multiple_copies) < count:
                 self.stdout.write(
@@ -51,48 +60,67 @@ class Command(BaseCommand):
                     )
                 )
 
-            created_loans = 0
+            loans_to_create = []
             unavailable_books = []
 
             for book in books_with_multiple_copies:
-                copies = book.bookcopy_set.all()
+                copies = book.copies_list
+
+                # Fetch active loans for all copies in one query
+                borrowed_ids = set(BookLoan.objects.filter(
+                    book_copy__in=copies,
+                    status='borrowed'
+                ).values_list('book_copy_id', flat=True))
                 user_idx = 0
-                
+
                 # Borrow all copies of this book to different users
                 for copy in copies:
                     # Check if already borrowed
-                    if not copy.is_available:
+                    if copy.id in borrowed_ids:
                         continue
-                        
+
                     user = users[user_idx % len(users)]
-                    
+
                     # Create loan with due date in the future
                     loan_date = timezone.now().date() - timedelta(days=3)
                     due_date = loan_date + timedelta(days=14)
-                    
-                    BookLoan.objects.create(
+
+                    loans_to_create.append(BookLoan(
                         user=user,
                         book_copy=copy,
                         borrow_date=loan_date,
                         due_date=due_date,
                         status='borrowed'
-                    )
-                    
-                    created_loans += 1
+                    ))
+
+                    borrowed_ids.add(copy.id)
                     user_idx += 1
-                    
-                    self.stdout.write(
-                        f'  - Borrowed {copy.barcode} to {user.username}'
-                    )
-                
+
+                    if verbosity >= 2:
+                        self.stdout.write(
+                            f'  - Borrowed {copy.barcode} to {user.username}'
+                        )
+
                 # Check if all copies are now borrowed
-                available_count = sum(1 for c in copies if c.is_available)
+                available_count = sum(
+                    1 for c in copies if c.id not in borrowed_ids
+                )
                 if available_count == 0:
                     unavailable_books.append(book)
-                    self.stdout.write(
-                        f'✓ {book.title} is now fully unavailable '
-                        f'({copies.count()} copies all borrowed)'
-                    )
+                    if verbosity >= 2:
+                        self.stdout.write(
+                            f'✓ {book.title} is now fully unavailable '
+                            f'({len(copies)} copies all borrowed)'
+                        )
+
+            # Insert all loans in one batch instead of one INSERT per copy
+            BookLoan.objects.bulk_create(loans_to_create, batch_size=500)
+            created_loans = len(loans_to_create)
+            # bulk_create skips the signal receivers that maintain the
+            # denormalized Book.loan_count, so resync the affected books
+            recount_book_loan_counts(
+                {loan.book_copy.book_id for loan in loans_to_create}
+            )
 
             self.stdout.write(
                 self.style.SUCCESS(
@@ -102,17 +130,19 @@ class Command(BaseCommand):
                 )
             )
             
-            self.stdout.write(
-                '\n📚 Books now available for reservation testing:'
-            )
-            for book in unavailable_books:
-                author_name = (
-                    book.authors.first().name if book.authors.first()
-                    else 'Unknown Author'
+            if verbosity >= 2:
+                self.stdout.write(
+                    '\n📚 Books now available for reservation testing:'
                 )
-                self.stdout.write(f'  - {book.title} by {author_name}')
-                copy_count = book.bookcopy_set.count()
-                self.stdout.write(f'    All {copy_count} copies borrowed')
+                for book in unavailable_books:
+                    # Uses the prefetched authors cache, no extra query
+                    authors = book.authors.all()
+                    author_name = (
+                        authors[0].name if authors else 'Unknown Author'
+                    )
+                    self.stdout.write(f'  - {book.title} by {author_name}')
+                    copy_count = len(book.copies_list)
+                    self.stdout.write(f'    All {copy_count} copies borrowed')
                 
         except Exception as e:
             self.stdout.write(
@@ -1,133 +1,152 @@
+from collections import defaultdict
+
 from django.core.management.base import BaseCommand
 from django.db import transaction
+from django.db.models import Count
 from library.models import Branch, Section, BookCopy, Book
+import numpy as np
 import random
 
+# Preferred section slugs per book category, resolved against the
+# per-branch slug index without any LIKE queries
+CATEGORY_TO_SECTIONS = {
+    'fiction': ('fiction',),
+    'non-fiction': ('non-fiction',),
+    'children': ('childrens-books', 'children'),
+    'research': ('research', 'academic'),
+    'academic': ('academic', 'research'),
+    'reference': ('reference',),
+}
+
 
 class Command(BaseCommand):
     help = ('Distribute existing book copies across branches and '
             'create additional copies')
 
     def handle(self, *args, **options):
-        with transaction.atomic():
-            # Get all branches
-            branches = list(Branch.objects.all())
-            if not branches:
-                self.stdout.write(
-                    self.style.ERROR(
-                        'No branches found. Run setup_library_structure first.'
-                    )
+        # Get all branches
+        branches = list(Branch.objects.all())
+        if not branches:
+            self.stdout.write(
+                self.style.ERROR(
+                    'No branches found. Run setup_library_structure first.'
                 )
-                return
+            )
+            return
+
+        self.stdout.write(f'Found {len(branches)} branches')
 
-            self.stdout.write(f'Found {len(branches)} branches')
-            
-            # Get all existing book copies
+        # Get all existing book copies with their book joined in,
+        # fetching only the columns the assignment actually reads
+        book_copies = BookCopy.objects.filter(
+            branch__isnull=True,
+            section__isnull=True
+        ).select_related('book').only('id', 'book__id', 'book__category')
+
+        if not book_copies.exists():
+            self.stdout.write(
+                self.style.WARNING(
+                    'No unassigned book copies found. Creating new ones...'
+                )
+            )
+            # Create some book copies if none exist
+            self._create_sample_book_copies()
             book_copies = BookCopy.objects.filter(
                 branch__isnull=True,
                 section__isnull=True
-            )
-            
-            if not book_copies.exists():
-                self.stdout.write(
-                    self.style.WARNING(
-                        'No unassigned book copies found. Creating new ones...'
-                    )
-                )
-                # Create some book copies if none exist
-                self._create_sample_book_copies()
-                book_copies = BookCopy.objects.filter(
-                    branch__isnull=True,
-                    section__isnull=True
+            ).select_related('book').only('id', 'book__id', 'book__category')
+
+        self.stdout.write(
+            f'Distributing {book_copies.count()} book copies'
+        )
+
+        # Resolve all sections once and group them by branch so the
+        # loop never queries the sections table
+        sections_by_branch = self._sections_by_branch()
+
+        # Stream the copies instead of loading them all, and commit in
+        # chunks of 500 so no single transaction spans the whole run
+        copies_assigned = 0
+        to_update = []
+        branch_draws = []
+        for book_copy in book_copies.iterator(chunk_size=1000):
+            # Randomly assign to a branch; draws come 500 at a time from
+            # a single C-level choices() call instead of one per copy
+            if not branch_draws:
+                branch_draws = random.choices(branches, k=500)
+            branch = branch_draws.pop()
+
+            # Get sections for this branch, prefer matching book category
+            sections = sections_by_branch.get(branch.id)
+            if sections:
+                section = self._section_for_category(
+                    book_copy.book.category, sections
                 )
-            
-            self.stdout.write(
-                f'Distributing {book_copies.count()} book copies'
-            )
-            
-            copies_assigned = 0
-            for book_copy in book_copies:
-                # Randomly assign to a branch
-                branch = random.choice(branches)
-                
-                # Get sections for this branch, prefer matching book category
-                sections = Section.objects.filter(branch=branch)
-                if sections.exists():
-                    # Try to match book category to section
-                    book_category = getattr(book_copy.book, 'category', None)
-                    if book_category:
-                        matching_sections = sections.filter(
-                            name__icontains=book_category.replace(
-                                '_', ' '
-                            ).title()
-                        )
-                        if matching_sections.exists():
-                            section = matching_sections.first()
-                        else:
-                            # Try some common mappings
-                            if 'fiction' in book_category.lower():
-                                fiction_sections = sections.filter(
-                                    name__icontains='Fiction'
-                                )
-                                section = (
-                                    fiction_sections.first()
-                                    if fiction_sections.exists()
-                                    else sections.first()
-                                )
-                            elif 'children' in book_category.lower():
-                                children_sections = sections.filter(
-                                    name__icontains='Children'
-                                )
-                                section = (
-                                    children_sections.first()
-                                    if children_sections.exists()
-                                    else sections.first()
-                                )
-                            elif 'research' in book_category.lower():
-                                research_sections = sections.filter(
-                                    name__icontains='Research'
-                                )
-                                section = (
-                                    research_sections.first()
-                                    if research_sections.exists()
-                                    else sections.first()
-                                )
-                            else:
-                                section = sections.first()
-                    else:
-                        section = sections.first()
-                else:
-                    section = None
-                
-                # Update the book copy
-                book_copy.branch = branch
-                book_copy.section = section
-                book_copy.save()
-                
-                copies_assigned += 1
-                
-                if copies_assigned % 10 == 0:
-                    self.stdout.write(f'Assigned {copies_assigned} copies...')
-            
-            # Create additional copies for popular books across branches
+            else:
+                section = None
+
+            book_copy.branch = branch
+            book_copy.section = section
+            to_update.append(book_copy)
+
+            if len(to_update) >= 500:
+                copies_assigned += self._flush_updates(to_update)
+                to_update = []
+                self.stdout.write(f'Assigned {copies_assigned} copies...')
+
+        copies_assigned += self._flush_updates(to_update)
+
+        # Create additional copies for popular books across branches
+        with transaction.atomic():
             self._create_additional_copies()
-            
-            # Summary
+
+        # Summary
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\n✅ Successfully assigned {copies_assigned} book copies'
+            )
+        )
+
+        # Show distribution by branch with one GROUP BY query
+        # instead of two COUNTs per branch
+        summary = Branch.objects.annotate(
+            copies_count=Count('bookcopy', distinct=True),
+            sections_count=Count('section', distinct=True)
+        )
+        self.stdout.write('\nDistribution by Branch:')
+        for branch in summary:
             self.stdout.write(
-                self.style.SUCCESS(
-                    f'\n✅ Successfully assigned {copies_assigned} book copies'
-                )
+                f'  📍 {branch.name}: {branch.copies_count} books, '
+                f'{branch.sections_count} sections'
             )
-            
-            # Show distribution by branch
-            self.stdout.write('\nDistribution by Branch:')
-            for branch in branches:
-                count = BookCopy.objects.filter(branch=branch).count()
-                sections_count = Section.objects.filter(branch=branch).count()
-                self.stdout.write(
-                    f'  📍 {branch.name}: {count} books, '
-                    f'{sections_count} sections'
-                )
+
+    def _flush_updates(self, to_update):
+        """Write one chunk of assignments in its own transaction"""
+        if not to_update:
+            return 0
+        with transaction.atomic():
+            BookCopy.objects.bulk_update(to_update, ['branch', 'section'])
+        return len(to_update)
+
+    def _sections_by_branch(self):
+        """Index all sections by branch id and slug in one query"""
+        sections_by_branch = defaultdict(dict)
+        for section in Section.objects.all():
+            sections_by_branch[section.branch_id].setdefault(
+                section.slug, section
+            )
+        return sections_by_branch
+
+    def _section_for_category(self, book_category, sections_by_slug):
+        """Resolve a category to a section via the precompiled table"""
+        for slug in CATEGORY_TO_SECTIONS.get((book_category or '').lower(),
+                                             ()):
+            section = sections_by_slug.get(slug)
+            if section:
+                return section
+
+        # Default to the branch's first section
+        return next(iter(sections_by_slug.values()))
 
     def _create_sample_book_copies(self):
         """Create sample book copies if none exist"""
@@ -139,17 +158,29 @@ class Command(BaseCommand):
             )
             return
         
+        books = list(books)
+        copy_counts = random.choices([1, 2, 3], k=len(books))
+
+        # Draw every price in one vectorized batch instead of a
+        # random.uniform call per copy
+        prices = np.random.uniform(100, 500, size=sum(copy_counts)).round(2)
+
+        price_idx = 0
+        copies = []
         for i, book in enumerate(books):
             # Create 1-3 copies per book
-            num_copies = random.randint(1, 3)
-            for j in range(num_copies):
-                BookCopy.objects.create(
+            for j in range(copy_counts[i]):
+                copies.append(BookCopy(
                     book=book,
                     barcode=f'BC{book.id:04d}{j+1:02d}',
-                    purchase_price=random.uniform(100, 500),
+                    purchase_price=float(prices[price_idx]),
                     condition='good'
-                )
-        
+                ))
+                price_idx += 1
+
+        # One multi-row INSERT instead of one per copy
+        BookCopy.objects.bulk_create(copies, batch_size=500)
+
         self.stdout.write(
             self.style.SUCCESS(
                 f'Created sample book copies for {len(books)} books'
@@ -158,72 +189,60 @@ class Command(BaseCommand):
 
     def _create_additional_copies(self):
         """Create additional copies for each branch"""
-        branches = Branch.objects.all()
-        books = Book.objects.all()[:15]  # Top 15 books
-        
-        copies_created = 0
-        
+        branches = list(Branch.objects.prefetch_related('section_set'))
+        books = list(Book.objects.all()[:15])  # Top 15 books
+
+        # Fetch every (book, branch) pair that already has copies in one
+        # query instead of a COUNT per pair
+        existing_pairs = set(BookCopy.objects.filter(
+            book_id__in=[b.id for b in books[:8]],
+            branch_id__in=[br.id for br in branches]
+        ).values_list('book_id', 'branch_id'))
+
+        # Pre-draw copy counts and prices in single batched RNG calls
+        max_pairs = len(branches) * len(books[:8])
+        copy_counts = random.choices([1, 2], k=max_pairs)
+        prices = np.random.uniform(150, 600, size=max_pairs * 2).round(2)
+
+        copies_to_create = []
+        pair_idx = 0
+        price_idx = 0
+
         for branch in branches:
-            sections = Section.objects.filter(branch=branch)
-            
+            sections = {s.slug: s for s in branch.section_set.all()}
+
             # Create 2-3 additional copies per branch for popular books
             for book in books[:8]:  # Top 8 books get copies in each branch
                 # Skip if this book already has copies in this branch
-                existing_copies = BookCopy.objects.filter(
-                    book=book,
-                    branch=branch
-                ).count()
-                
-                if existing_copies == 0:
+                if (book.id, branch.id) not in existing_pairs:
                     # Choose appropriate section
-                    section = self._get_appropriate_section(book, sections)
+                    section = (
+                        self._section_for_category(book.category, sections)
+                        if sections else None
+                    )
                     
                     # Create 1-2 copies
-                    num_copies = random.randint(1, 2)
+                    num_copies = copy_counts[pair_idx]
                     for i in range(num_copies):
                         barcode = f'BC{book.id:04d}{branch.id:02d}{i+1:02d}'
-                        BookCopy.objects.create(
+                        copies_to_create.append(BookCopy(
                             book=book,
                             branch=branch,
                             section=section,
                             barcode=barcode,
-                            purchase_price=random.uniform(150, 600),
+                            purchase_price=float(prices[price_idx]),
                             condition='good'
-                        )
-                        copies_created += 1
-        
+                        ))
+                        price_idx += 1
+                pair_idx += 1
+
+        # Flush everything in one batched INSERT
+        BookCopy.objects.bulk_create(copies_to_create, batch_size=500)
+
         self.stdout.write(
             self.style.SUCCESS(
-                f'Created {copies_created} additional copies across branches'
+                f'Created {len(copies_to_create)} additional copies '
+                'across branches'
             )
         )
 
-    def _get_appropriate_section(self, book, sections):
-        """Get the most appropriate section for a book"""
-        if not sections.exists():
-            return None
-            
-        book_category = getattr(book, 'category', '').lower()
-        
-        # Try to match category to section name
-        if 'fiction' in book_category:
-            fiction_sections = sections.filter(name__icontains='Fiction')
-            if fiction_sections.exists():
-                return fiction_sections.first()
-        elif 'children' in book_category:
-            children_sections = sections.filter(name__icontains='Children')
-            if children_sections.exists():
-                return children_sections.first()
-        elif 'research' in book_category or 'academic' in book_category:
-            research_sections = sections.filter(
-                name__icontains='Research'
-            ) or sections.filter(name__icontains='Academic')
-            if research_sections.exists():
-                return research_sections.first()
-        elif 'reference' in book_category:
-            ref_sections = sections.filter(name__icontains='Reference')
-            if ref_sections.exists():
-                return ref_sections.first()
-        
-        # Default to first available section
-        return sections.first()
@@ -0,0 +1,40 @@
+"""
+Management command to run the initial setup commands
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+
+def _run_command(name):
+    """Run one management command inside a worker process"""
+    # Drop connections inherited from the parent so each worker opens
+    # its own instead of sharing a socket
+    connections.close_all()
+    call_command(name)
+    return name
+
+
+class Command(BaseCommand):
+    help = ('Run library structure and staff role setup in parallel, '
+            'then distribute books')
+
+    def handle(self, *args, **options):
+        # The two setup commands touch disjoint tables, so they can
+        # overlap in separate worker processes
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            futures = [
+                executor.submit(_run_command, 'setup_library_structure'),
+                executor.submit(_run_command, 'setup_staff_roles'),
+            ]
+            for future in futures:
+                self.stdout.write(
+                    self.style.SUCCESS(f'Finished {future.result()}')
+                )
+
+        # Distribution depends on both setups, so it runs serially
+        call_command('distribute_books_to_branches')
@@ -1,4 +1,5 @@
 from django.core.management.base import BaseCommand
+from django.utils.text import slugify
 from library.models import Branch, Section
 
 
@@ -50,15 +51,16 @@ class Command(BaseCommand):
         ]
         
         created_branches = 0
-        created_sections = 0
-        
+
+        branches_by_name = {}
         for branch_data in branches_data:
             # Create or get branch
             branch, created = Branch.objects.get_or_create(
                 name=branch_data['name'],
                 defaults={'location': branch_data['location']}
             )
-            
+            branches_by_name[branch_data['name']] = branch
+
             if created:
                 created_branches += 1
                 self.stdout.write(
@@ -72,19 +74,24 @@ class Command(BaseCommand):
                         f'Branch already exists: {branch.name}'
                     )
                 )
-            
-            # Create sections for this branch
-            for section_name in branch_data['sections']:
-                section, created = Section.objects.get_or_create(
+
+        # Insert all sections in one batch; the unique constraint on
+        # (name, branch) plus ignore_conflicts keeps re-runs idempotent
+        before = Section.objects.count()
+        Section.objects.bulk_create(
+            [
+                Section(
                     name=section_name,
-                    branch=branch
+                    slug=slugify(section_name),
+                    branch=branches_by_name[branch_data['name']]
                 )
-                
-                if created:
-                    created_sections += 1
-                    self.stdout.write(
-                        f'  + Created section: {section_name}'
-                    )
+                for branch_data in branches_data
+                for section_name in branch_data['sections']
+            ],
+            ignore_conflicts=True,
+            batch_size=500
+        )
+        created_sections = Section.objects.count() - before
         
         # Summary
         self.stdout.write(
@@ -95,12 +102,12 @@ class Command(BaseCommand):
         self.stdout.write(f'Branches created: {created_branches}')
         self.stdout.write(f'Sections created: {created_sections}')
         
-        # Show current structure
+        # Show current structure; sections come from a single prefetch
+        # instead of one query per branch
         self.stdout.write('\nCurrent Library Structure:')
-        for branch in Branch.objects.all():
+        for branch in Branch.objects.prefetch_related('section_set'):
             self.stdout.write(f'\n📍 {branch.name} ({branch.location})')
-            sections = Section.objects.filter(branch=branch)
-            for section in sections:
+            for section in branch.section_set.all():
                 self.stdout.write(f'   📚 {section.name}')
                 
         self.stdout.write(
@@ -52,19 +52,22 @@ class Command(BaseCommand):
             ('manage_staff', 'Manage all staff accounts'),
         ]
 
-        created_permissions = []
-        for code, description in permissions_data:
-            permission, created = Permission.objects.get_or_create(
-                code=code,
-                defaults={'description': description}
-            )
-            if created:
-                created_permissions.append(permission)
+        # One batched INSERT; the unique code column plus
+        # ignore_conflicts replaces a get_or_create per permission
+        before = Permission.objects.count()
+        Permission.objects.bulk_create(
+            [
+                Permission(code=code, description=description)
+                for code, description in permissions_data
+            ],
+            ignore_conflicts=True
+        )
+        created_permissions = Permission.objects.count() - before
 
         if created_permissions:
             self.stdout.write(
                 self.style.SUCCESS(
-                    f'Created {len(created_permissions)} permissions'
+                    f'Created {created_permissions} permissions'
                 )
             )
 
@@ -79,21 +82,21 @@ class Command(BaseCommand):
             'view_all_data', 'manage_staff'
         ] + librarian_permissions  # Managers have all librarian permissions
 
-        # Assign librarian permissions
-        for perm_code in librarian_permissions:
-            permission = Permission.objects.get(code=perm_code)
-            RolePermission.objects.get_or_create(
-                role=librarian_role,
-                permission=permission
-            )
-
-        # Assign manager permissions
-        for perm_code in manager_permissions:
-            permission = Permission.objects.get(code=perm_code)
-            RolePermission.objects.get_or_create(
-                role=manager_role,
-                permission=permission
-            )
+        # Fetch every permission once keyed by code, then assign both
+        # roles with a single batched INSERT
+        perm_map = Permission.objects.in_bulk(field_name='code')
+        RolePermission.objects.bulk_create(
+            [
+                RolePermission(
+                    role=librarian_role, permission=perm_map[code]
+                )
+                for code in librarian_permissions
+            ] + [
+                RolePermission(role=manager_role, permission=perm_map[code])
+                for code in manager_permissions
+            ],
+            ignore_conflicts=True
+        )
 
         self.stdout.write(
             self.style.SUCCESS(
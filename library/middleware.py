@@ -0,0 +1,39 @@
+"""
+Custom middleware for the library app
+Resolves the session's active branch once per request
+"""
+
+
+class ActiveBranchMiddleware:
+    """
+    Middleware that attaches the active branch to the request
+
+    Resolves the branch from the session against the cached branch
+    list (see library.utils.get_cached_branches), so branch-aware
+    views can read ``request.active_branch`` without querying. Falls
+    back to the first branch and seeds the session when none is set.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        from library.utils import get_cached_branches
+
+        branches = get_cached_branches()
+        active_branch_id = request.session.get('active_branch_id')
+        active_branch = None
+
+        if active_branch_id:
+            active_branch = next(
+                (b for b in branches if b.id == active_branch_id), None
+            )
+
+        if not active_branch and branches:
+            active_branch = branches[0]
+            request.session['active_branch_id'] = active_branch.id
+            request.session['active_branch_name'] = active_branch.name
+
+        request.branches = branches
+        request.active_branch = active_branch
+
+        return self.get_response(request)
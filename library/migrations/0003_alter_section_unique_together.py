@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-08-26 12:30
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0002_bookcopy_branch_bookcopy_section'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='section',
+            unique_together={('name', 'branch')},
+        ),
+    ]
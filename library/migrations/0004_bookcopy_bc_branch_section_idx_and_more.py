@@ -0,0 +1,25 @@
+# Generated by Django 5.2.5 on 2026-08-26 12:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0003_alter_section_unique_together'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bookcopy',
+            index=models.Index(fields=['branch', 'section'], name='bc_branch_section_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bookcopy',
+            index=models.Index(fields=['book', 'branch'], name='bc_book_branch_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bookcopy',
+            index=models.Index(condition=models.Q(('branch__isnull', True), ('section__isnull', True)), fields=['id'], name='bc_unassigned_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-08-26 12:35
+
+from django.db import migrations, models
+from django.utils.text import slugify
+
+
+def backfill_slugs(apps, schema_editor):
+    Section = apps.get_model('library', 'Section')
+    sections = list(Section.objects.filter(slug=''))
+    for section in sections:
+        section.slug = slugify(section.name)
+    Section.objects.bulk_update(sections, ['slug'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0004_bookcopy_bc_branch_section_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='section',
+            name='slug',
+            field=models.SlugField(blank=True, max_length=64),
+        ),
+        migrations.RunPython(backfill_slugs, migrations.RunPython.noop),
+    ]
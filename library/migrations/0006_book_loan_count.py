@@ -0,0 +1,37 @@
+# Generated by Django 5.2.5 on 2026-08-26 13:17
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_loan_counts(apps, schema_editor):
+    Book = apps.get_model('library', 'Book')
+    BookLoan = apps.get_model('circulation', 'BookLoan')
+    counts = BookLoan.objects.values('book_copy__book').annotate(
+        c=Count('pk')
+    )
+    for row in counts:
+        Book.objects.filter(pk=row['book_copy__book']).update(
+            loan_count=row['c']
+        )
+
+
+def noop(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0005_section_slug'),
+        ('circulation', '0004_bookloan_loan_borrow_date_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='loan_count',
+            field=models.PositiveIntegerField(db_index=True, default=0),
+        ),
+        migrations.RunPython(backfill_loan_counts, noop),
+    ]
@@ -6,6 +6,7 @@ Implements book catalog, inventory, and branch management
 from django.db import models
 from django.core.validators import RegexValidator
 from django.utils import timezone
+from django.utils.text import slugify
 
 
 class Branch(models.Model):
@@ -37,11 +38,20 @@ class BranchManager(models.Model):
 class Section(models.Model):
     """Sections within library branches"""
     name = models.CharField(max_length=255)
+    # Normalized name so lookups use an indexed equality match instead
+    # of icontains
+    slug = models.SlugField(max_length=64, blank=True, db_index=True)
     branch = models.ForeignKey(Branch, on_delete=models.CASCADE)
-    
+
     class Meta:
         db_table = 'sections'
-    
+        unique_together = [('name', 'branch')]
+
+    def save(self, *args, **kwargs):
+        if not self.slug:
+            self.slug = slugify(self.name)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.name} ({self.branch.name})"
 
@@ -70,6 +80,41 @@ class Author(models.Model):
         return self.name
 
 
+class BookQuerySet(models.QuerySet):
+    """Queryset helpers for the book catalog"""
+
+    def with_availability(self):
+        """Annotate each book with its available-copy count
+
+        Lets list views read ``book.available_copies`` without issuing
+        a COUNT query per book. The on-loan check is a per-copy
+        anti-join, mirroring ``get_available_copies_count``: a ``~Q``
+        across the joined loan rows would count a borrowed copy as
+        available whenever it also has an older returned loan.
+        """
+        from django.db.models.functions import Coalesce
+        from circulation.models import BookLoan
+        available = BookCopy.objects.filter(
+            book=models.OuterRef('pk'), condition='good'
+        ).filter(
+            ~models.Exists(
+                BookLoan.objects.filter(
+                    book_copy=models.OuterRef('pk'), status='borrowed'
+                )
+            )
+        ).order_by().values('book').annotate(
+            c=models.Count('pk')
+        ).values('c')
+        return self.annotate(
+            available_copies=Coalesce(
+                models.Subquery(
+                    available, output_field=models.IntegerField()
+                ),
+                0,
+            )
+        )
+
+
 class Book(models.Model):
     """Book catalog entries"""
     isbn_validator = RegexValidator(
@@ -102,15 +147,41 @@ class Book(models.Model):
     publisher = models.ForeignKey(Publisher, on_delete=models.PROTECT)
     section = models.ForeignKey(Section, on_delete=models.PROTECT)
     authors = models.ManyToManyField(Author, through='BookAuthor')
-    
+    # Denormalized total of loans ever made against this title,
+    # maintained by BookLoan signals (see library.utils). Lets the
+    # popular-books list be an indexed ORDER BY instead of a join +
+    # GROUP BY over the whole loan history.
+    loan_count = models.PositiveIntegerField(default=0, db_index=True)
+
+    objects = BookQuerySet.as_manager()
+
     class Meta:
         db_table = 'books'
-    
+        indexes = [
+            # Composite indexes matching the search filters and their
+            # permitted sort keys, so filtered pages sort off the
+            # index instead of a filesort
+            models.Index(
+                fields=['category', 'title'], name='book_category_title_idx'
+            ),
+            models.Index(
+                fields=['language', 'title'], name='book_language_title_idx'
+            ),
+            models.Index(
+                fields=['publication_year'], name='book_pub_year_idx'
+            ),
+        ]
+
     def __str__(self):
         return f"{self.title} ({self.isbn})"
-    
+
     def get_available_copies_count(self):
         """Count available copies for borrowing"""
+        # Reuse the with_availability() annotation when present instead
+        # of issuing a COUNT per call
+        annotated = getattr(self, 'available_copies', None)
+        if annotated is not None:
+            return annotated
         return self.bookcopy_set.filter(
             condition='good'
         ).exclude(
@@ -135,6 +206,46 @@ class BookAuthor(models.Model):
         return f"{self.book.title} by {self.author.name}"
 
 
+class BookCopyQuerySet(models.QuerySet):
+    """Queryset helpers for physical copies"""
+
+    def with_availability(self):
+        """Annotate each copy with a SQL-computed availability flag
+
+        Mirrors ``is_available``: good condition and no active loan.
+        Lets views count availability with a filtered aggregate
+        instead of iterating copies in Python.
+        """
+        from circulation.models import BookLoan
+        return self.annotate(
+            _is_available=models.ExpressionWrapper(
+                models.Q(condition='good')
+                & ~models.Exists(
+                    BookLoan.objects.filter(
+                        book_copy=models.OuterRef('pk'),
+                        status='borrowed',
+                    )
+                ),
+                output_field=models.BooleanField(),
+            )
+        )
+
+    def with_current_loan(self):
+        """Prefetch each copy's active loans in one query
+
+        The loans land on ``active_loans`` so ``is_available`` can
+        answer without a query per copy.
+        """
+        from circulation.models import BookLoan
+        return self.prefetch_related(
+            models.Prefetch(
+                'bookloan_set',
+                queryset=BookLoan.objects.filter(status='borrowed'),
+                to_attr='active_loans',
+            )
+        )
+
+
 class BookCopy(models.Model):
     """Physical copies of books"""
     CONDITION_CHOICES = [
@@ -156,18 +267,43 @@ class BookCopy(models.Model):
         max_length=20, choices=CONDITION_CHOICES, default='good'
     )
     last_seen = models.DateField(default=timezone.now)
-    
+
+    objects = BookCopyQuerySet.as_manager()
+
     class Meta:
         db_table = 'book_copies'
         verbose_name_plural = 'Book Copies'
+        indexes = [
+            models.Index(
+                fields=['branch', 'section'], name='bc_branch_section_idx'
+            ),
+            models.Index(fields=['book', 'branch'], name='bc_book_branch_idx'),
+            # Partial index so the "unassigned copies" filter used by the
+            # distribution command stays an index scan
+            models.Index(
+                fields=['id'],
+                name='bc_unassigned_idx',
+                condition=models.Q(branch__isnull=True)
+                & models.Q(section__isnull=True),
+            ),
+        ]
     
     def __str__(self):
         return f"{self.book.title} - {self.barcode}"
     
     def is_available(self):
         """Check if copy is available for borrowing"""
+        # Reuse the with_availability() annotation when present
+        annotated = getattr(self, '_is_available', None)
+        if annotated is not None:
+            return bool(annotated)
         if self.condition != 'good':
             return False
+        # Reuse the with_current_loan() prefetch when present instead
+        # of querying per copy
+        active_loans = getattr(self, 'active_loans', None)
+        if active_loans is not None:
+            return not active_loans
         current_loan = self.bookloan_set.filter(status='borrowed').first()
         return current_loan is None
 
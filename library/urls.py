@@ -48,6 +48,9 @@ urlpatterns = [
          name='staff_book_management'),
     path('staff/reservations/', staff_views.approve_reservations,
          name='approve_reservations'),
+    path('staff/reservations/bulk-approve/',
+         staff_views.bulk_approve_reservations,
+         name='bulk_approve_reservations'),
     path('staff/loans/', staff_views.loan_management, name='loan_management'),
     path('staff/fines/', staff_views.fine_management, name='fine_management'),
     
@@ -0,0 +1,162 @@
+"""
+Shared helpers for the library app
+"""
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+BRANCHES_CACHE_KEY = 'all_branches_v1'
+BRANCHES_CACHE_TIMEOUT = 600
+
+
+def dashboard_stats_version():
+    """Current version component of the dashboard stat cache keys"""
+    version = cache.get('dashboard_stats_version')
+    if version is None:
+        cache.set('dashboard_stats_version', 1, None)
+        version = 1
+    return version
+
+
+def invalidate_dashboard_stats():
+    """Bump the version so cached dashboard stats get recomputed"""
+    try:
+        cache.incr('dashboard_stats_version')
+    except ValueError:
+        cache.set('dashboard_stats_version', 1, None)
+
+
+@receiver(post_save, sender='circulation.BookLoan')
+@receiver(post_delete, sender='circulation.BookLoan')
+@receiver(post_save, sender='circulation.Fine')
+@receiver(post_delete, sender='circulation.Fine')
+@receiver(post_save, sender='circulation.Reservation')
+@receiver(post_delete, sender='circulation.Reservation')
+def _invalidate_dashboard_stats_on_write(sender, **kwargs):
+    # Keeps the cached dashboards fresh for writes that happen outside
+    # the staff views, e.g. member-facing flows and management
+    # commands. Bulk updates bypass signals, so those call sites still
+    # invalidate explicitly.
+    invalidate_dashboard_stats()
+
+
+@receiver(post_save, sender='circulation.BookLoan')
+def _increment_book_loan_count(sender, instance, created, **kwargs):
+    # Maintains the denormalized Book.loan_count column. The metric is
+    # "loans ever made", matching the old Count('bookcopy__bookloan')
+    # annotation, so only row creation and deletion move it.
+    if created:
+        from library.models import Book
+        Book.objects.filter(bookcopy=instance.book_copy_id).update(
+            loan_count=F('loan_count') + 1
+        )
+
+
+@receiver(post_delete, sender='circulation.BookLoan')
+def _decrement_book_loan_count(sender, instance, **kwargs):
+    from library.models import Book
+    Book.objects.filter(
+        bookcopy=instance.book_copy_id, loan_count__gt=0
+    ).update(loan_count=F('loan_count') - 1)
+
+
+def recount_book_loan_counts(book_ids=None):
+    """Recompute Book.loan_count from the actual loan rows
+
+    bulk_create skips the signal receivers above, so call sites that
+    batch-insert loans (seed commands, bulk approval) must resync the
+    counter afterwards. Limited to ``book_ids`` when given, otherwise
+    recounts the whole catalog.
+    """
+    from django.db.models import Count
+    from library.models import Book
+    books = Book.objects.all()
+    if book_ids is not None:
+        books = books.filter(pk__in=book_ids)
+    # Batch books sharing a total into one UPDATE each
+    by_total = {}
+    for pk, total in books.annotate(
+        _total=Count('bookcopy__bookloan')
+    ).values_list('pk', '_total'):
+        by_total.setdefault(total, []).append(pk)
+    for total, pks in by_total.items():
+        Book.objects.filter(pk__in=pks).exclude(
+            loan_count=total
+        ).update(loan_count=total)
+
+
+def get_cached_branches():
+    """Return the branch list from cache
+
+    Branches change rarely but appear in the context of almost every
+    staff page; caching the materialized list avoids re-querying the
+    table per request. Writes to Branch evict the entry via signals.
+    """
+    from library.models import Branch
+    return cache.get_or_set(
+        BRANCHES_CACHE_KEY,
+        lambda: list(Branch.objects.all()),
+        BRANCHES_CACHE_TIMEOUT,
+    )
+
+
+@receiver(post_save, sender='library.Branch')
+@receiver(post_delete, sender='library.Branch')
+def _invalidate_branches_cache(sender, **kwargs):
+    cache.delete(BRANCHES_CACHE_KEY)
+
+
+SECTIONS_CACHE_TIMEOUT = 300
+
+
+@receiver(post_save, sender='library.Section')
+@receiver(post_delete, sender='library.Section')
+def _invalidate_sections_cache(sender, instance, **kwargs):
+    cache.delete('sections:{}'.format(instance.branch_id))
+
+
+BOOK_COUNT_CACHE_KEY = 'book_total_count_v1'
+BOOK_COUNT_CACHE_TIMEOUT = 300
+
+
+def get_cached_book_count():
+    """Catalog-wide book count from cache
+
+    Every search and management page shows the total; caching it keeps
+    the repeated COUNT(*) off the hot path. Writes to Book evict the
+    entry via signals.
+    """
+    from library.models import Book
+    return cache.get_or_set(
+        BOOK_COUNT_CACHE_KEY,
+        lambda: fast_count(Book),
+        BOOK_COUNT_CACHE_TIMEOUT,
+    )
+
+
+@receiver(post_save, sender='library.Book')
+@receiver(post_delete, sender='library.Book')
+def _invalidate_book_count_cache(sender, **kwargs):
+    cache.delete(BOOK_COUNT_CACHE_KEY)
+
+
+def fast_count(model):
+    """Estimated row count for display-only stats
+
+    On PostgreSQL this reads the planner's reltuples estimate, which is
+    O(1) regardless of table size. Other backends fall back to an exact
+    COUNT(*).
+    """
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+                [model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if row is not None and row[0] >= 0:
+            return int(row[0])
+    return model.objects.count()
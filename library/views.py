@@ -8,15 +8,25 @@ from django.views.generic import (
 )
 from django.contrib.auth.decorators import login_required
 from django.utils.decorators import method_decorator
+from django.views.decorators.cache import cache_control
 from django.contrib import messages
-from django.db.models import Q, Count, Avg
+from django.db.models import (
+    Q, Count, Avg, Sum, Prefetch, Exists, OuterRef, Subquery, IntegerField
+)
+from django.db.models.functions import Coalesce
+from django.core.cache import cache
 from django.core.paginator import Paginator
 from django.utils import timezone
 from django.urls import reverse_lazy
 from django.http import JsonResponse
 from datetime import timedelta
+from decimal import Decimal
 
 from .models import Book, Author, Publisher, Branch, Section, BookCopy
+from .utils import (
+    dashboard_stats_version, get_cached_book_count, get_cached_branches,
+    SECTIONS_CACHE_TIMEOUT,
+)
 from circulation.models import BookLoan, Reservation, Fine
 from authentication.models import User
 
@@ -28,42 +38,42 @@ class DashboardView(TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        # Get active branch from session
-        active_branch_id = self.request.session.get('active_branch_id')
-        branches = Branch.objects.all()
-        active_branch = None
-        
-        if active_branch_id:
-            try:
-                active_branch = Branch.objects.get(id=active_branch_id)
-            except Branch.DoesNotExist:
-                pass
-        
-        if not active_branch and branches.exists():
-            active_branch = branches.first()
-            self.request.session['active_branch_id'] = active_branch.id
-            self.request.session['active_branch_name'] = active_branch.name
-        
-        # Statistics for the active branch or all if no branch selected
-        if active_branch:
-            total_books = BookCopy.objects.filter(branch=active_branch).count()
-            borrowed_books = BookLoan.objects.filter(
-                book_copy__branch=active_branch,
-                status='borrowed'
-            ).count()
-        else:
-            total_books = Book.objects.count()
-            borrowed_books = BookLoan.objects.filter(status='borrowed').count()
-        
-        # Statistics for all users
-        context['stats'] = {
-            'total_books': total_books,
-            'borrowed_books': borrowed_books,
-            'reservations': Reservation.objects.filter(
-                status='active'
-            ).count(),
-            'pending_fines': Fine.objects.filter(paid=False).count(),
-        }
+        # Active branch and branch list come pre-resolved from
+        # ActiveBranchMiddleware, with no query behind either.
+        branches = self.request.branches
+        active_branch = self.request.active_branch
+        
+        # Global statistics, cached briefly per branch. Loan/fine/
+        # reservation writes bump the version (see library.utils), so
+        # the TTL only has to cover catalog edits.
+        def _global_stats():
+            if active_branch:
+                total_books = BookCopy.objects.filter(
+                    branch=active_branch
+                ).count()
+                borrowed_books = BookLoan.objects.filter(
+                    book_copy__branch=active_branch,
+                    status='borrowed'
+                ).count()
+            else:
+                total_books = Book.objects.count()
+                borrowed_books = BookLoan.objects.filter(
+                    status='borrowed'
+                ).count()
+            return {
+                'total_books': total_books,
+                'borrowed_books': borrowed_books,
+                'reservations': Reservation.objects.filter(
+                    status='active'
+                ).count(),
+                'pending_fines': Fine.objects.filter(paid=False).count(),
+            }
+
+        stats_key = 'dashboard_stats:{}:v{}'.format(
+            active_branch.id if active_branch else 'all',
+            dashboard_stats_version(),
+        )
+        context['stats'] = dict(cache.get_or_set(stats_key, _global_stats, 30))
         
         # Branch context
         context['branches'] = branches
@@ -76,37 +86,47 @@ class DashboardView(TemplateView):
             # Recent loans
             context['recent_loans'] = BookLoan.objects.filter(
                 user=user
+            ).select_related(
+                'book_copy__book', 'book_copy__branch'
             ).order_by('-borrow_date')[:5]
-            
+
             # Active reservations
             context['reservations'] = Reservation.objects.filter(
                 user=user,
                 status='active'
+            ).select_related('book').prefetch_related(
+                'book__authors'
             ).order_by('-reservation_date')[:5]
-            
+
             # Overdue books
             overdue_loans = BookLoan.objects.filter(
                 user=user,
                 status='borrowed',
                 due_date__lt=timezone.now().date()
-            )
+            ).select_related('book_copy__book', 'book_copy__branch')
             context['overdue_books'] = overdue_loans
             
             # Update pending fines for user
             context['stats']['pending_fines'] = Fine.objects.filter(
                 user=user,
                 paid=False
-            ).aggregate(total=Count('amount'))['total'] or 0
+            ).aggregate(
+                total=Coalesce(Sum('amount'), Decimal('0'))
+            )['total']
         
-        # Popular books (branch-specific if active branch selected)
-        popular_books = Book.objects.annotate(
-            loan_count=Count('bookcopy__bookloan')
-        )
+        # Popular books. The denormalized Book.loan_count column makes
+        # the global list an indexed ORDER BY; the branch-scoped
+        # variant still counts on the fly since the counter is global.
         if active_branch:
-            popular_books = popular_books.filter(
+            context['popular_books'] = Book.objects.filter(
                 bookcopy__branch=active_branch
-            )
-        context['popular_books'] = popular_books.order_by('-loan_count')[:8]
+            ).annotate(
+                branch_loan_count=Count('bookcopy__bookloan', distinct=True)
+            ).order_by('-branch_loan_count')[:8]
+        else:
+            context['popular_books'] = Book.objects.order_by(
+                '-loan_count'
+            )[:8]
         
         context['today'] = timezone.now()
         
@@ -116,7 +136,13 @@ class DashboardView(TemplateView):
 class BookSearchView(TemplateView):
     """Book search and listing"""
     template_name = 'library/book_search.html'
-    
+
+    # Sort keys the UI offers; anything else falls back to title so
+    # user input never reaches order_by() unchecked
+    ALLOWED_SORTS = {
+        'title', '-title', 'publication_year', '-publication_year'
+    }
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
@@ -127,54 +153,91 @@ class BookSearchView(TemplateView):
         branch_id = self.request.GET.get('branch', '')
         availability = self.request.GET.get('availability', '')
         sort_by = self.request.GET.get('sort_by', 'title')
+        if sort_by not in self.ALLOWED_SORTS:
+            sort_by = 'title'
         per_page = int(self.request.GET.get('per_page', 12))
         
-        # Build queryset
-        books = Book.objects.all()
-        
-        # Apply filters
+        # Build queryset. The result cards only read a handful of
+        # columns, so trim the select list and batch-load the related
+        # names the cards render.
+        books = Book.objects.select_related(
+            'publisher', 'section__branch'
+        ).only(
+            'id', 'title', 'isbn', 'category', 'edition',
+            'publication_year', 'language', 'publisher__name',
+            'section__name', 'section__branch__name',
+        ).prefetch_related(
+            Prefetch('authors', queryset=Author.objects.only('id', 'name'))
+        ).with_availability()
+        
+        # Apply filters. Multi-valued relations are probed with EXISTS
+        # subqueries so the outer query never fans out and needs no
+        # distinct() dedupe pass.
         if query:
+            author_match = Author.objects.filter(
+                bookauthor__book=OuterRef('pk'),
+                name__icontains=query,
+            )
             books = books.filter(
                 Q(title__icontains=query) |
-                Q(bookauthor__author__name__icontains=query) |
                 Q(isbn__icontains=query) |
-                Q(publisher__name__icontains=query)
-            ).distinct()
-        
+                Q(publisher__name__icontains=query) |
+                Q(Exists(author_match))
+            )
+
         if category:
             books = books.filter(category=category)
-            
+
         if language:
             books = books.filter(language=language)
-            
+
         if branch_id:
             books = books.filter(section__branch_id=branch_id)
-            
+
         if availability == 'available':
-            books = books.filter(bookcopy__condition='good').exclude(
-                bookcopy__bookloan__status='borrowed'
-            ).distinct()
+            # A good-condition copy with no active loan
+            available_copy = BookCopy.objects.filter(
+                book=OuterRef('pk'),
+                condition='good',
+            ).filter(
+                ~Exists(
+                    BookLoan.objects.filter(
+                        book_copy=OuterRef('pk'), status='borrowed'
+                    )
+                )
+            )
+            books = books.filter(Exists(available_copy))
         elif availability == 'borrowed':
             books = books.filter(
-                bookcopy__bookloan__status='borrowed'
-            ).distinct()
+                Exists(
+                    BookLoan.objects.filter(
+                        book_copy__book=OuterRef('pk'), status='borrowed'
+                    )
+                )
+            )
         
         # Apply sorting
         if sort_by:
             books = books.order_by(sort_by)
         
-        # Pagination
+        # Pagination. The numbered page links in the template need a
+        # real total, so the OFFSET paginator stays; the catalog-wide
+        # count behind it comes from cache, and unfiltered pages reuse
+        # it so the paginator skips its own COUNT(*).
+        total_books = get_cached_book_count()
         paginator = Paginator(books, per_page)
+        if not (query or category or language or branch_id or availability):
+            paginator.count = total_books
         page = self.request.GET.get('page')
         books = paginator.get_page(page)
-        
+
         # Context data
         context['books'] = books
         context['query'] = query
-        context['total_books'] = Book.objects.count()
+        context['total_books'] = total_books
         context['categories'] = Book.CATEGORY_CHOICES
         context['languages'] = Book.LANGUAGE_CHOICES
-        context['branches'] = Branch.objects.all()
+        context['branches'] = get_cached_branches()
         
         return context
 
@@ -189,47 +252,68 @@ class BookDetailView(DetailView):
         context = super().get_context_data(**kwargs)
         book = self.object
         
-        # Get all copies for this book
+        # Get all copies for this book, prefetching each copy's active
+        # loan so the grouping loop below never hits the database
         all_copies = BookCopy.objects.filter(book=book).select_related(
             'branch', 'section'
+        ).prefetch_related(
+            Prefetch(
+                'bookloan_set',
+                queryset=BookLoan.objects.filter(
+                    status='borrowed'
+                ).select_related('user'),
+                to_attr='active_loans',
+            )
         )
         context['copies'] = all_copies
-        
+
+        # Per-branch counters in one GROUP BY instead of incrementing
+        # in Python per row. The on-loan check is a per-copy Exists
+        # flag; a ~Q over the joined loan rows would count a borrowed
+        # copy as available if it also had an older returned loan.
+        branch_stats = {
+            row['branch_id']: row
+            for row in BookCopy.objects.filter(book=book).annotate(
+                _on_loan=Exists(
+                    BookLoan.objects.filter(
+                        book_copy=OuterRef('pk'), status='borrowed'
+                    )
+                )
+            ).values('branch_id').annotate(
+                total=Count('id'),
+                available=Count(
+                    'id',
+                    filter=Q(condition='good', _on_loan=False),
+                ),
+            )
+        }
+
         # Group copies by branch with detailed information
         copies_by_branch = {}
         for copy in all_copies:
             branch = copy.branch
             if branch not in copies_by_branch:
+                stats = branch_stats.get(copy.branch_id, {})
                 copies_by_branch[branch] = {
                     'branch': branch,
                     'copies': [],
-                    'available_count': 0,
-                    'total_count': 0
+                    'available_count': stats.get('available', 0),
+                    'total_count': stats.get('total', 0)
                 }
-            
-            # Get current loan information
-            current_loan = None
-            borrowed_by = None
-            if not copy.is_available():
-                current_loan = BookLoan.objects.filter(
-                    book_copy=copy,
-                    status='borrowed'
-                ).select_related('user').first()
-                if current_loan:
-                    borrowed_by = current_loan.user
-            
+
+            # Current loan information from the prefetch
+            current_loan = copy.active_loans[0] if copy.active_loans else None
+            borrowed_by = current_loan.user if current_loan else None
+
             copy_info = {
                 'copy': copy,
                 'current_loan': current_loan,
                 'borrowed_by': borrowed_by,
                 'is_available': copy.is_available()
             }
-            
+
             copies_by_branch[branch]['copies'].append(copy_info)
-            copies_by_branch[branch]['total_count'] += 1
-            if copy.is_available() and copy.condition == 'good':
-                copies_by_branch[branch]['available_count'] += 1
-        
+
         context['copies_by_branch'] = copies_by_branch
         
         # Similar books
@@ -259,29 +343,51 @@ class ManageBooksView(ListView):
             messages.error(self.request, 'Access denied.')
             return Book.objects.none()
         
-        queryset = Book.objects.all().order_by('title')
-        
-        # Search functionality for staff
+        queryset = Book.objects.only(
+            'id', 'title', 'isbn', 'category', 'publication_year'
+        ).prefetch_related(
+            Prefetch('authors', queryset=Author.objects.only('id', 'name'))
+        ).order_by('title')
+        
+        # Search functionality for staff. ISBN-looking input takes a
+        # prefix match on the unique (indexed) isbn column; everything
+        # else falls back to the title/author scan, with the author
+        # match as an EXISTS subquery so the join never duplicates
+        # book rows.
         search = self.request.GET.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) |
-                Q(isbn__icontains=search) |
-                Q(bookauthor__author__name__icontains=search)
-            ).distinct()
-            
+            cleaned = search.replace('-', '').strip()
+            if cleaned and all(c.isdigit() or c in 'xX' for c in cleaned):
+                queryset = queryset.filter(
+                    isbn__startswith=cleaned.upper()
+                )
+            else:
+                author_match = Author.objects.filter(
+                    bookauthor__book=OuterRef('pk'),
+                    name__icontains=search,
+                )
+                queryset = queryset.filter(
+                    Q(title__icontains=search) |
+                    Q(isbn__icontains=search) |
+                    Q(Exists(author_match))
+                )
+
         return queryset
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        # Statistics for management
+        # Statistics for management — one pass over book_copies instead
+        # of a COUNT query per condition
+        copy_stats = BookCopy.objects.aggregate(
+            total_copies=Count('id'),
+            available_copies=Count('id', filter=Q(condition='good')),
+            damaged_copies=Count('id', filter=Q(condition='damaged')),
+            lost_copies=Count('id', filter=Q(condition='lost')),
+        )
         context['stats'] = {
-            'total_books': Book.objects.count(),
-            'total_copies': BookCopy.objects.count(),
-            'available_copies': BookCopy.objects.filter(condition='good').count(),
-            'damaged_copies': BookCopy.objects.filter(condition='damaged').count(),
-            'lost_copies': BookCopy.objects.filter(condition='lost').count(),
+            'total_books': get_cached_book_count(),
+            **copy_stats,
         }
         
         return context
@@ -371,11 +477,14 @@ class AddBookCopyView(CreateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['book'] = self.book
-        # Get available and borrowed copy counts
-        all_copies = BookCopy.objects.filter(book=self.book)
-        context['total_copies'] = all_copies.count()
-        available_count = sum(1 for copy in all_copies if copy.is_available())
-        context['available_copies'] = available_count
+        # Available and total copy counts in one filtered aggregate
+        copy_stats = BookCopy.objects.filter(
+            book=self.book
+        ).with_availability().aggregate(
+            total_copies=Count('id'),
+            available_copies=Count('id', filter=Q(_is_available=True)),
+        )
+        context.update(copy_stats)
         return context
     
     def form_valid(self, form):
@@ -406,25 +515,25 @@ class ManageBookCopiesView(ListView):
     def get_queryset(self):
         return BookCopy.objects.filter(book=self.book).select_related(
             'branch', 'section'
-        ).order_by('-last_seen')
+        ).with_current_loan().order_by('-last_seen')
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['book'] = self.book
         
-        # Get all copies for statistics
-        all_copies = self.get_queryset()
-        context['total_copies'] = all_copies.count()
-        context['available_copies'] = sum(
-            1 for copy in all_copies if copy.is_available()
-        )
-        context['borrowed_copies'] = sum(
-            1 for copy in all_copies if not copy.is_available()
-            and copy.condition == 'good'
-        )
-        context['other_copies'] = sum(
-            1 for copy in all_copies if copy.condition != 'good'
+        # Copy statistics in one filtered aggregate instead of
+        # iterating the queryset in Python
+        copy_stats = BookCopy.objects.filter(
+            book=self.book
+        ).with_availability().aggregate(
+            total_copies=Count('id'),
+            available_copies=Count('id', filter=Q(_is_available=True)),
+            borrowed_copies=Count(
+                'id', filter=Q(condition='good') & Q(_is_available=False)
+            ),
+            other_copies=Count('id', filter=~Q(condition='good')),
         )
+        context.update(copy_stats)
         
         # Get all branches for filtering
         context['branches'] = Branch.objects.all()
@@ -501,9 +610,24 @@ class BranchManagementView(ListView):
         return super().dispatch(request, *args, **kwargs)
     
     def get_queryset(self):
+        # Counting two reverse relations in one annotate joins them
+        # against each other and multiplies both numbers; correlated
+        # subqueries keep each count independent.
+        section_count = Subquery(
+            Section.objects.filter(branch=OuterRef('pk')).values(
+                'branch'
+            ).annotate(c=Count('pk')).values('c'),
+            output_field=IntegerField(),
+        )
+        book_count = Subquery(
+            BookCopy.objects.filter(branch=OuterRef('pk')).values(
+                'branch'
+            ).annotate(c=Count('pk')).values('c'),
+            output_field=IntegerField(),
+        )
         return Branch.objects.prefetch_related('section_set').annotate(
-            total_books=Count('bookcopy'),
-            total_sections=Count('section_set')
+            total_books=Coalesce(book_count, 0),
+            total_sections=Coalesce(section_count, 0),
         )
     
     def get_context_data(self, **kwargs):
@@ -511,7 +635,7 @@ class BranchManagementView(ListView):
         
         # Branch statistics
         context['stats'] = {
-            'total_branches': Branch.objects.count(),
+            'total_branches': len(get_cached_branches()),
             'total_sections': Section.objects.count(),
             'total_books': BookCopy.objects.count(),
             'branches_with_books': Branch.objects.annotate(
@@ -538,14 +662,26 @@ def set_active_branch(request, branch_id):
     return redirect(request.META.get('HTTP_REFERER', 'library:dashboard'))
 
 
+@cache_control(max_age=300, public=True)
 def get_sections_for_branch(request):
-    """AJAX endpoint to get sections for a branch"""
+    """AJAX endpoint to get sections for a branch
+
+    Sections change rarely, so the list is served from cache and the
+    browser may reuse its copy for five minutes. Section writes evict
+    the entry via signals (see library.utils).
+    """
     branch_id = request.GET.get('branch_id')
     if branch_id:
-        sections = Section.objects.filter(branch_id=branch_id).values(
-            'id', 'name'
+        sections = cache.get_or_set(
+            'sections:{}'.format(branch_id),
+            lambda: list(
+                Section.objects.filter(branch_id=branch_id).values(
+                    'id', 'name'
+                )
+            ),
+            SECTIONS_CACHE_TIMEOUT,
         )
-        return JsonResponse({'sections': list(sections)})
+        return JsonResponse({'sections': sections})
     return JsonResponse({'sections': []})
 
 
@@ -560,13 +696,13 @@ class BranchDetailView(DetailView):
         context = super().get_context_data(**kwargs)
         branch = self.object
         
-        # Branch statistics
+        # Branch statistics — the two copy counts share one pass
+        copy_stats = BookCopy.objects.filter(branch=branch).aggregate(
+            total_books=Count('id'),
+            available_books=Count('id', filter=Q(condition='good')),
+        )
         context['stats'] = {
-            'total_books': BookCopy.objects.filter(branch=branch).count(),
-            'available_books': BookCopy.objects.filter(
-                branch=branch,
-                condition='good'
-            ).count(),
+            **copy_stats,
             'borrowed_books': BookLoan.objects.filter(
                 book_copy__branch=branch,
                 status='borrowed'
@@ -582,6 +718,8 @@ class BranchDetailView(DetailView):
         # Recent activity
         context['recent_loans'] = BookLoan.objects.filter(
             book_copy__branch=branch
+        ).select_related(
+            'book_copy__book', 'user'
         ).order_by('-borrow_date')[:5]
         
         return context
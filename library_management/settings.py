@@ -64,6 +64,7 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'authentication.middleware.SessionTimeoutMiddleware',
     'authentication.middleware.AuditLogMiddleware',
+    'library.middleware.ActiveBranchMiddleware',
 ]
 
 ROOT_URLCONF = 'library_management.urls'
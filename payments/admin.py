@@ -1,3 +1,23 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import Payment, FinePayment
+
+
+@admin.register(Payment)
+class PaymentAdmin(admin.ModelAdmin):
+    list_display = ['transaction_id', 'user', 'purpose', 'amount',
+                    'status', 'payment_method', 'payment_date', 'processed_by']
+    list_filter = ['purpose', 'status', 'payment_method']
+    search_fields = ['transaction_id', 'user__username', 'user__email']
+    date_hierarchy = 'payment_date'
+    # The changelist renders user/processed_by per row; one JOINed
+    # query instead of two extra queries per payment
+    list_select_related = ['user', 'processed_by']
+
+
+@admin.register(FinePayment)
+class FinePaymentAdmin(admin.ModelAdmin):
+    list_display = ['user', 'payment', 'fine', 'partial_payment']
+    list_filter = ['partial_payment']
+    search_fields = ['user__username', 'payment__transaction_id']
+    list_select_related = ['user', 'payment', 'fine']
@@ -0,0 +1,55 @@
+from django.db import migrations
+
+# Backing views for the unmanaged MonthlyRevenue / DailyRevenue models.
+# Plain views recompute on read, which is fine at this table size; a
+# PostgreSQL deployment can swap them for materialized views with a
+# scheduled REFRESH without touching the models.
+
+CREATE_MONTHLY_REVENUE = """
+CREATE VIEW monthly_revenue AS
+SELECT
+    ROW_NUMBER() OVER (ORDER BY strftime('%Y-%m-01', payment_date)) AS id,
+    strftime('%Y-%m-01', payment_date) AS month,
+    COALESCE(SUM(CASE WHEN purpose = 'membership' THEN amount END), 0)
+        AS membership_revenue,
+    COALESCE(SUM(CASE WHEN purpose = 'fine' THEN amount END), 0)
+        AS fine_revenue,
+    COALESCE(SUM(CASE WHEN purpose = 'digital' THEN amount END), 0)
+        AS service_revenue,
+    COALESCE(SUM(CASE WHEN purpose = 'reservation' THEN amount END), 0)
+        AS reservation_revenue,
+    SUM(amount) AS total_revenue
+FROM payments
+WHERE status = 'completed'
+GROUP BY strftime('%Y-%m-01', payment_date)
+"""
+
+CREATE_DAILY_REVENUE = """
+CREATE VIEW daily_revenue AS
+SELECT
+    ROW_NUMBER() OVER (ORDER BY DATE(payment_date)) AS id,
+    DATE(payment_date) AS date,
+    SUM(amount) AS total_amount,
+    COUNT(*) AS transaction_count
+FROM payments
+WHERE status = 'completed'
+GROUP BY DATE(payment_date)
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0004_payment_pay_user_date_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            CREATE_MONTHLY_REVENUE,
+            reverse_sql='DROP VIEW monthly_revenue',
+        ),
+        migrations.RunSQL(
+            CREATE_DAILY_REVENUE,
+            reverse_sql='DROP VIEW daily_revenue',
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-08-26 13:29
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0005_revenue_views'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='paymenthistory',
+            index=models.Index(fields=['payment', '-changed_at'], name='payhist_pay_date_idx'),
+        ),
+    ]
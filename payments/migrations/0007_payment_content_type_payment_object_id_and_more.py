@@ -0,0 +1,62 @@
+# Generated by Django 5.2.5 on 2026-08-26 13:33
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# Each payment purpose maps to exactly one model, so the typed link
+# can be derived from the legacy purpose/related_id pair
+PURPOSE_TO_MODEL = {
+    'membership': ('authentication', 'membershipfee'),
+    'fine': ('circulation', 'fine'),
+    'reservation': ('circulation', 'reservation'),
+    'digital': ('circulation', 'digitalservice'),
+}
+
+
+def backfill_related_objects(apps, schema_editor):
+    Payment = apps.get_model('payments', 'Payment')
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    for purpose, (app_label, model) in PURPOSE_TO_MODEL.items():
+        content_type = ContentType.objects.filter(
+            app_label=app_label, model=model
+        ).first()
+        if content_type is None:
+            continue
+        Payment.objects.filter(
+            purpose=purpose, related_id__isnull=False
+        ).update(content_type=content_type, object_id=models.F('related_id'))
+
+
+def clear_related_objects(apps, schema_editor):
+    Payment = apps.get_model('payments', 'Payment')
+    Payment.objects.update(content_type=None, object_id=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('payments', '0006_paymenthistory_payhist_pay_date_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payment',
+            name='content_type',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='contenttypes.contenttype'),
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='object_id',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['content_type', 'object_id'], name='pay_related_obj_idx'),
+        ),
+        migrations.RunPython(
+            backfill_related_objects, clear_related_objects
+        ),
+    ]
@@ -3,6 +3,7 @@ Payment models for Library Management System
 Implements payment processing for memberships, fines, and services
 """
 
+from django.contrib.contenttypes.fields import GenericForeignKey
 from django.db import models
 from django.utils import timezone
 from django.core.validators import MinValueValidator
@@ -34,8 +35,18 @@ class Payment(models.Model):
     
     user = models.ForeignKey('authentication.User', on_delete=models.CASCADE)
     purpose = models.CharField(max_length=20, choices=PURPOSE_CHOICES)
-    related_id = models.IntegerField(null=True, blank=True, 
+    related_id = models.IntegerField(null=True, blank=True,
                                    help_text="ID of related record (polymorphic)")
+    # Typed link to the record this payment settles. Kept alongside
+    # the legacy related_id so existing readers keep working; new code
+    # should set and read related_object so list views can prefetch
+    # the targets instead of resolving purpose/related_id per row.
+    content_type = models.ForeignKey(
+        'contenttypes.ContentType', on_delete=models.SET_NULL,
+        null=True, blank=True
+    )
+    object_id = models.PositiveIntegerField(null=True, blank=True)
+    related_object = GenericForeignKey('content_type', 'object_id')
     amount = models.DecimalField(max_digits=10, decimal_places=2, 
                                validators=[MinValueValidator(0.01)])
     status = models.CharField(max_length=20, choices=PAYMENT_STATUS_CHOICES, 
@@ -51,7 +62,26 @@ class Payment(models.Model):
     class Meta:
         db_table = 'payments'
         ordering = ['-payment_date']
-    
+        indexes = [
+            # Per-user history pages order by recency
+            models.Index(
+                fields=['user', '-payment_date'], name='pay_user_date_idx'
+            ),
+            # Revenue reports group completed payments by purpose
+            models.Index(
+                fields=['purpose', 'status'], name='pay_purpose_status_idx'
+            ),
+            # Date-range report filters over completed payments
+            models.Index(
+                fields=['status', 'payment_date'], name='pay_status_date_idx'
+            ),
+            # Reverse lookups from a fine/membership to its payments
+            models.Index(
+                fields=['content_type', 'object_id'],
+                name='pay_related_obj_idx',
+            ),
+        ]
+
     def __str__(self):
         return f"{self.user.username} - {self.get_purpose_display()} - MVR {self.amount}"
     
@@ -60,30 +90,32 @@ class Payment(models.Model):
         self.status = 'completed'
         self.processed_by = processed_by_user
         self.payment_date = timezone.now()
-        self.save()
-        
-        # Update related records
-        if self.purpose == 'fine' and self.related_id:
-            try:
-                from circulation.models import Fine
-                fine = Fine.objects.get(id=self.related_id)
-                fine.mark_paid()
-            except Fine.DoesNotExist:
-                pass
-        elif self.purpose == 'reservation' and self.related_id:
-            try:
-                from circulation.models import Reservation
-                # Create reservation payment record if needed
-                pass
-            except:
-                pass
+        # Narrow save keeps the post_save receivers (revenue report
+        # invalidation) while writing only the changed columns
+        self.save(update_fields=['status', 'processed_by', 'payment_date'])
+
+        # Update related records, preferring the typed link over the
+        # legacy related_id
+        fine_id = self.object_id or self.related_id
+        if self.purpose == 'fine' and fine_id:
+            from circulation.models import Fine
+            from library.utils import invalidate_dashboard_stats
+            updated = Fine.objects.filter(
+                pk=fine_id, paid=False
+            ).update(paid=True, paid_date=timezone.now())
+            if updated:
+                # The queryset update bypasses the Fine signals, so
+                # invalidate the cached dashboards explicitly
+                invalidate_dashboard_stats()
     
     def mark_failed(self, reason=""):
         """Mark payment as failed"""
         self.status = 'failed'
+        fields = ['status']
         if reason:
             self.notes = reason
-        self.save()
+            fields.append('notes')
+        self.save(update_fields=fields)
 
 
 class PaymentHistory(models.Model):
@@ -99,6 +131,13 @@ class PaymentHistory(models.Model):
         db_table = 'payment_history'
         ordering = ['-changed_at']
         verbose_name_plural = 'Payment History'
+        indexes = [
+            # "History for payment X" ordered by recency
+            models.Index(
+                fields=['payment', '-changed_at'],
+                name='payhist_pay_date_idx',
+            ),
+        ]
     
     def __str__(self):
         return f"Payment {self.payment.transaction_id} - {self.status_change}"
@@ -184,6 +223,25 @@ class PaymentReport(models.Model):
     def __str__(self):
         return f"{self.get_report_type_display()} - {self.report_date}"
 
+    @classmethod
+    def upsert(cls, reports):
+        """Insert or refresh report rows in one statement
+
+        Regeneration hits the (report_type, report_date) unique pair,
+        so a get_or_create/save loop costs two round trips per row and
+        can abort on races. ON CONFLICT DO UPDATE folds both cases
+        into a single INSERT.
+        """
+        return cls.objects.bulk_create(
+            reports,
+            update_conflicts=True,
+            unique_fields=['report_type', 'report_date'],
+            update_fields=[
+                'total_amount', 'transaction_count', 'details',
+                'generated_at',
+            ],
+        )
+
 
 # Revenue tracking views (implemented as models for Django ORM)
 class MonthlyRevenue(models.Model):
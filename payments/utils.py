@@ -0,0 +1,76 @@
+"""
+Shared helpers for the payments app
+"""
+
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+REVENUE_REPORT_TIMEOUT = 3600
+
+
+def revenue_report_version():
+    """Current version component of the revenue report cache keys"""
+    version = cache.get('revenue_report_version')
+    if version is None:
+        cache.set('revenue_report_version', 1, None)
+        version = 1
+    return version
+
+
+def invalidate_revenue_reports():
+    """Bump the version so cached revenue reports get recomputed"""
+    try:
+        cache.incr('revenue_report_version')
+    except ValueError:
+        cache.set('revenue_report_version', 1, None)
+
+
+@receiver(post_save, sender='payments.Payment')
+@receiver(post_delete, sender='payments.Payment')
+def _invalidate_revenue_reports_on_write(sender, **kwargs):
+    invalidate_revenue_reports()
+
+
+MEMBERSHIP_FEES_CACHE_KEY = 'membership_fees_v1'
+MEMBERSHIP_FEES_CACHE_TIMEOUT = 300
+
+
+def get_cached_membership_fees():
+    """Return the membership fee plans from cache
+
+    The fee table holds a handful of rows that change almost never but
+    back every membership page render. Writes to MembershipFee evict
+    the entry via signals.
+    """
+    from authentication.models import MembershipFee
+    return cache.get_or_set(
+        MEMBERSHIP_FEES_CACHE_KEY,
+        lambda: list(MembershipFee.objects.all()),
+        MEMBERSHIP_FEES_CACHE_TIMEOUT,
+    )
+
+
+@receiver(post_save, sender='authentication.MembershipFee')
+@receiver(post_delete, sender='authentication.MembershipFee')
+def _invalidate_membership_fees_cache(sender, **kwargs):
+    cache.delete(MEMBERSHIP_FEES_CACHE_KEY)
+
+
+def get_cached_revenue_report():
+    """Read-through cache for the payment reports page
+
+    Repeat hits within the TTL skip the revenue-view aggregation
+    entirely; Payment writes bump the version so a fresh payment shows
+    up on the next request.
+    """
+    from payments.models import MonthlyRevenue, DailyRevenue
+    key = 'payment_revenue_report:v{}'.format(revenue_report_version())
+    return cache.get_or_set(
+        key,
+        lambda: {
+            'monthly_revenue': list(MonthlyRevenue.objects.all()[:12]),
+            'daily_revenue': list(DailyRevenue.objects.all()[:30]),
+        },
+        REVENUE_REPORT_TIMEOUT,
+    )
@@ -8,8 +8,14 @@ from django.contrib.auth.decorators import login_required
 from django.utils.decorators import method_decorator
 from django.contrib import messages
 from django.urls import reverse
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce
+from decimal import Decimal
+
 from circulation.models import Fine
 from .models import Payment, FinePayment
+from .utils import get_cached_membership_fees, get_cached_revenue_report
 
 
 @method_decorator(login_required, name='dispatch')
@@ -24,19 +30,23 @@ class MembershipPaymentView(View):
     template_name = 'payments/membership.html'
     
     def get(self, request):
-        from authentication.models import MembershipFee
-        
+        # The cached fee list doubles as the lookup table for the
+        # user's current plan, so the page renders without a query
+        fees = get_cached_membership_fees()
         context = {
-            'membership_types': MembershipFee.objects.all(),
-            'current_membership': request.user.membership_fee,
+            'membership_types': fees,
+            'current_membership': next(
+                (f for f in fees if f.id == request.user.membership_fee_id),
+                None,
+            ),
         }
         return render(request, self.template_name, context)
     
     def post(self, request):
-        from authentication.models import MembershipFee, User
+        from authentication.models import MembershipFee
         from .models import Payment, MembershipPayment
         from django.utils import timezone
-        from datetime import datetime, timedelta
+        from datetime import timedelta
         
         membership_type = request.POST.get('membership_type')
         payment_method = request.POST.get('payment_method', 'cash')
@@ -49,42 +59,51 @@ class MembershipPaymentView(View):
             return redirect('payments:membership')
         
         try:
-            # Get membership fee details
-            membership_fee = MembershipFee.objects.get(membership_type=membership_type)
-            
-            # Create payment record
-            payment = Payment.objects.create(
-                user=request.user,
-                purpose='membership',
-                related_id=membership_fee.id,
-                amount=amount,
-                payment_method=payment_method,
-                status='completed',
-                notes=notes
-            )
-            
-            # Calculate validity period
-            today = timezone.now().date()
-            if period == 'annually':
-                valid_until = today + timedelta(days=365)
-            else:
-                valid_until = today + timedelta(days=30)
-            
-            # Create membership payment record
-            MembershipPayment.objects.create(
-                user=request.user,
-                payment=payment,
-                membership_type=membership_type,
-                period=period,
-                valid_from=today,
-                valid_until=valid_until
-            )
-            
-            # Update user's membership
-            request.user.membership_fee = membership_fee
-            request.user.membership_status = 'active'
-            request.user.save()
-            
+            # All three writes commit together so a failure can't
+            # leave a payment without a membership (or vice versa)
+            with transaction.atomic():
+                # Get membership fee details
+                membership_fee = MembershipFee.objects.get(
+                    membership_type=membership_type
+                )
+
+                # Create payment record
+                payment = Payment.objects.create(
+                    user=request.user,
+                    purpose='membership',
+                    related_id=membership_fee.id,
+                    related_object=membership_fee,
+                    amount=amount,
+                    payment_method=payment_method,
+                    status='completed',
+                    notes=notes
+                )
+
+                # Calculate validity period
+                today = timezone.now().date()
+                if period == 'annually':
+                    valid_until = today + timedelta(days=365)
+                else:
+                    valid_until = today + timedelta(days=30)
+
+                # Create membership payment record
+                MembershipPayment.objects.create(
+                    user=request.user,
+                    payment=payment,
+                    membership_type=membership_type,
+                    period=period,
+                    valid_from=today,
+                    valid_until=valid_until
+                )
+
+                # Update user's membership, writing only the two
+                # columns that changed
+                request.user.membership_fee = membership_fee
+                request.user.membership_status = 'active'
+                request.user.save(
+                    update_fields=['membership_fee', 'membership_status']
+                )
+
             messages.success(
                 request,
                 f'{membership_fee.get_membership_type_display()} membership activated successfully! '
@@ -112,9 +131,13 @@ class FinePaymentView(ListView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        unpaid_fines = self.get_queryset()
-        context['total_unpaid'] = sum(fine.amount for fine in unpaid_fines)
-        context['fine_count'] = unpaid_fines.count()
+        # One aggregate over the queryset ListView already resolved,
+        # instead of re-running it and summing decimals in Python
+        fine_stats = self.object_list.aggregate(
+            total_unpaid=Coalesce(Sum('amount'), Decimal('0')),
+            fine_count=Count('id'),
+        )
+        context.update(fine_stats)
         return context
 
 
@@ -124,8 +147,11 @@ class PayFineView(View):
     template_name = 'payments/pay_fine.html'
     
     def get(self, request, fine_id):
+        # One JOINed fetch covers the loan/copy/book chain the page
+        # renders
         fine = get_object_or_404(
-            Fine, id=fine_id, user=request.user, paid=False
+            Fine.objects.select_related('book_loan__book_copy__book'),
+            id=fine_id, user=request.user, paid=False
         )
         context = {
             'fine': fine,
@@ -141,31 +167,38 @@ class PayFineView(View):
         return render(request, self.template_name, context)
     
     def post(self, request, fine_id):
-        fine = get_object_or_404(
-            Fine, id=fine_id, user=request.user, paid=False
-        )
         payment_method = request.POST.get('payment_method', 'cash')
-        
-        # Create payment record
-        payment = Payment.objects.create(
-            user=request.user,
-            purpose='fine',
-            related_id=fine.id,
-            amount=fine.amount,
-            payment_method=payment_method,
-            status='completed'
-        )
-        
-        # Create fine payment record
-        FinePayment.objects.create(
-            user=request.user,
-            payment=payment,
-            fine=fine
-        )
-        
-        # Mark fine as paid
-        fine.mark_paid()
-        
+
+        # Lock the fine row for the whole write sequence so a
+        # double-submit can't pay the same fine twice, and all three
+        # writes commit together
+        with transaction.atomic():
+            fine = get_object_or_404(
+                Fine.objects.select_for_update(),
+                id=fine_id, user=request.user, paid=False
+            )
+
+            # Create payment record
+            payment = Payment.objects.create(
+                user=request.user,
+                purpose='fine',
+                related_id=fine.id,
+                related_object=fine,
+                amount=fine.amount,
+                payment_method=payment_method,
+                status='completed'
+            )
+
+            # Create fine payment record
+            FinePayment.objects.create(
+                user=request.user,
+                payment=payment,
+                fine=fine
+            )
+
+            # Mark fine as paid
+            fine.mark_paid()
+
         messages.success(
             request,
             f'Fine of MVR {fine.amount} has been paid successfully!'
@@ -187,9 +220,19 @@ class PaymentHistoryView(ListView):
     """Payment history view"""
     template_name = 'payments/history.html'
     context_object_name = 'payments'
-    
+    paginate_by = 25
+
     def get_queryset(self):
-        return []
+        # The purpose-specific records hang off reverse one-to-ones,
+        # so one JOINed query serves every row the page renders
+        return Payment.objects.filter(
+            user=self.request.user
+        ).select_related(
+            'processed_by',
+            'membershippayment',
+            'finepayment__fine',
+            'digitalservicepayment__service',
+        )
 
 
 @method_decorator(login_required, name='dispatch')
@@ -203,6 +246,11 @@ class PaymentReportsView(TemplateView):
     """Payment reports"""
     template_name = 'payments/reports.html'
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update(get_cached_revenue_report())
+        return context
+
 
 @method_decorator(login_required, name='dispatch')
 class ProcessPaymentView(View):
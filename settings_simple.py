@@ -7,7 +7,9 @@ from pathlib import Path
 import os
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
-BASE_DIR = Path(__file__).resolve().parent.parent
+# This settings module lives at the project root, so one .parent
+# (unlike library_management/settings.py, which is a level deeper)
+BASE_DIR = Path(__file__).resolve().parent
 
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = 'django-insecure-)gulj(_#w9n0-cylk8awk7mvhha=)db56#lf@kv*shm)-pvlu2'
@@ -46,6 +48,7 @@ MIDDLEWARE = [
     'authentication.middleware.SessionTimeoutMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'library.middleware.ActiveBranchMiddleware',
 ]
 
 ROOT_URLCONF = 'library_management.urls'